@@ -1,11 +1,13 @@
 # streamlit_app.py
 from __future__ import annotations
 
+import hashlib
 import io
+import re
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-import pandas as pd
 import streamlit as st
 
 # --- ReportLab (vector PDF) ---
@@ -36,6 +38,10 @@ VERSION_PATH = APP_DIR / "assets" / "version.txt"
 # page + margins
 PAGE_W, PAGE_H = letter  # points
 MARGIN = 0.125 * inch    # 1/8 inch = 9 pt
+CONTENT_WIDTH = PAGE_W - 2 * MARGIN
+
+# Header/footer are downsampled once to this resolution at their drawn size
+IMAGE_DPI = 200
 
 # --- Absolute positions (points) for footer elements ---
 # Tune these once and they will not auto-shift.
@@ -63,23 +69,77 @@ TP_COL_WIDTHS = [174, 120, 60, 80, 80, 80]  # [Property, Test Method, Unit, Lowe
 DATE_KEYS = {
     "orderDate", "shippedDate", "manufacturingDate", "expirationDate", "testDate", "printDate"
 }
+# Lower-cased PDF table labels whose values are rendered as dates
+_DATE_LABELS = frozenset({
+    "order date", "shipped date", "manufacturing date", "expiration date", "test date", "certificate print date"
+})
 
 # --- Column width fitter ---
 def _fit_col_widths(widths: List[float], max_width: float) -> List[float]:
     """Scale widths proportionally if their sum exceeds max_width; otherwise return as-is."""
-    try:
-        total = float(sum(widths))
-    except Exception:
-        return widths
-    if total <= 0:
-        return widths
+    total = sum(widths)
     if total <= max_width:
         return widths
     scale = max_width / total
     return [w * scale for w in widths]
 
 
+# doc.width is always CONTENT_WIDTH (letter page, MARGIN on both sides), so fit
+# the constant widths here instead of inside every build
+_CI_W = _fit_col_widths(CI_COL_WIDTHS, CONTENT_WIDTH)
+_PI_W = _fit_col_widths(PI_COL_WIDTHS, CONTENT_WIDTH)
+_TP_W = _fit_col_widths(TP_COL_WIDTHS, CONTENT_WIDTH)
+
+
 # ------------------------ Data helpers ------------------------ #
+def _read_csv_arrow(file) -> Dict[str, str]:
+    """Parse a two-column field,value CSV with Arrow's CSV reader."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    table = pacsv.read_csv(
+        file,
+        read_options=pacsv.ReadOptions(autogenerate_column_names=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={"f0": pa.string(), "f1": pa.string()},
+            strings_can_be_null=False,
+        ),
+    )
+    if table.num_columns < 2:
+        return {}
+    field = pc.utf8_trim_whitespace(table.column(0))
+    value = pc.utf8_trim_whitespace(table.column(1))
+    keep = pc.and_(
+        pc.and_(pc.not_equal(field, ""), pc.not_equal(pc.utf8_lower(field), "field")),
+        pc.not_equal(value, ""),
+    )
+    return dict(zip(pc.filter(field, keep).to_pylist(), pc.filter(value, keep).to_pylist()))
+
+
+def _read_xlsx_openpyxl(file) -> Dict[str, str]:
+    """Stream field,value pairs from the first sheet of an .xlsx workbook."""
+    from openpyxl import load_workbook
+
+    data: Dict[str, str] = {}
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for row in ws.iter_rows(min_col=1, max_col=2, values_only=True):
+            field, value = (tuple(row) + (None, None))[:2]
+            if field is None or value is None:
+                continue
+            if isinstance(value, datetime):
+                value = value.strftime("%Y-%m-%d")
+            field, value = str(field).strip(), str(value).strip()
+            if not field or not value or field.lower() == "field":
+                continue
+            data[field] = value
+    finally:
+        wb.close()
+    return data
+
+
 def parse_uploaded_file(file) -> Dict[str, str]:
     """Parse a CSV/XLSX with two columns: field,value -> dict."""
     data: Dict[str, str] = {}
@@ -87,136 +147,298 @@ def parse_uploaded_file(file) -> Dict[str, str]:
         return data
     try:
         name = file.name.lower()
+        # pandas is imported only on the fallback/.xls paths to keep app start-up light
         if name.endswith(".csv"):
-            df = pd.read_csv(file, header=None)
-        elif name.endswith((".xls", ".xlsx")):
+            try:
+                return _read_csv_arrow(file)
+            except Exception:
+                # Arrow is strict about ragged rows/encodings; let pandas have a go
+                file.seek(0)
+            import pandas as pd
+
+            df = pd.read_csv(file, header=None, dtype=str, keep_default_na=False)
+        elif name.endswith(".xlsx"):
+            return _read_xlsx_openpyxl(file)
+        elif name.endswith(".xls"):
+            import pandas as pd
+
             df = pd.read_excel(file, header=None)
+            if df.shape[1] > 1:
+                # Excel date cells arrive as datetimes; render them as YYYY-MM-DD
+                value = df[1]
+                is_ts = value.map(lambda v: isinstance(v, datetime))
+                if is_ts.any():
+                    value = value.astype(object)
+                    value[is_ts] = pd.to_datetime(value[is_ts]).dt.strftime("%Y-%m-%d")
+                    df[1] = value
+            df = df.fillna("").astype(str)
         else:
             st.error("Unsupported file type. Please upload CSV or Excel.")
             return data
-        for _, row in df.iterrows():
-            if len(row) < 1:
-                continue
-            field = row.iloc[0]
-            if isinstance(field, str) and field.strip().lower() == "field":
-                continue
-            if pd.isna(field):
-                continue
-            value = row.iloc[1] if len(row) > 1 else ""
-            if pd.isna(value):
-                continue
-            if isinstance(value, pd.Timestamp):
-                value = value.strftime("%Y-%m-%d")
-            data[str(field).strip()] = str(value).strip()
+        df = df.reindex(columns=[0, 1], fill_value="")
+        field = df[0].str.strip()
+        value = df[1].str.strip()
+        keep = (field != "") & (field.str.lower() != "field") & (value != "")
+        data = dict(zip(field[keep], value[keep]))
     except Exception as exc:
         st.error(f"Failed to parse uploaded file: {exc}")
     return data
 
 
+# Form key prefix -> tested-property field name, in PDF column order
+_TEST_FIELDS = (
+    ("property", "property"),
+    ("testMethod", "test_method"),
+    ("unit", "unit"),
+    ("lowerLimit", "lower_limit"),
+    ("upperLimit", "upper_limit"),
+    ("result", "result"),
+)
+
+
 def assemble_test_data(form_values: Dict[str, str]) -> List[Dict[str, str]]:
     tests: List[Dict[str, str]] = []
     for idx in range(1, 9):
-        entry = {
-            "property": form_values.get(f"property{idx}", "").strip(),
-            "test_method": form_values.get(f"testMethod{idx}", "").strip(),
-            "unit": form_values.get(f"unit{idx}", "").strip(),
-            "lower_limit": form_values.get(f"lowerLimit{idx}", "").strip(),
-            "upper_limit": form_values.get(f"upperLimit{idx}", "").strip(),
-            "result": form_values.get(f"result{idx}", "").strip(),
-        }
-        if any(entry.values()):
-            tests.append(entry)
+        raw = [form_values.get(f"{prefix}{idx}", "") for prefix, _ in _TEST_FIELDS]
+        # Most rows are left blank; skip them before stripping every cell
+        if not any(r and not r.isspace() for r in raw):
+            continue
+        tests.append({name: r.strip() for (_, name), r in zip(_TEST_FIELDS, raw)})
     return tests
 
 
 # ------------------------ PDF generation ------------------------ #
 class NumberedCanvas(canvas.Canvas):
-    """Canvas that writes 'Page X of Y' and a version string during save()."""
+    """Canvas that writes 'Page X of Y' and a version string on every page.
+
+    Pages are emitted as soon as they are finished. Each one references a
+    per-page Form XObject for its page-number line, and save() fills those
+    forms in once the total page count is known.
+    """
     def __init__(self, *args, version_text: str = "1.0", footer_h: float = 0.0, **kwargs):
         super().__init__(*args, **kwargs)
-        self._saved_page_states = []
+        self._page_count = 0
         self._version_text = version_text
         self._footer_h = footer_h
 
     def showPage(self):
-        # Do NOT call super().showPage() here; we only store the state.
-        # The actual page emission happens once in save().
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
+        self._page_count += 1
+        self._draw_version()
+        self.doForm(self._page_label_form(self.getPageNumber()))
+        super().showPage()
 
     def save(self):
-        total_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self._draw_footer_numbers(total_pages)
-            super().showPage()
+        total_pages = self._page_count
+        for page_num in range(1, total_pages + 1):
+            self.beginForm(self._page_label_form(page_num))
+            self._draw_page_number(page_num, total_pages)
+            self.endForm()
         super().save()
 
-    def _draw_footer_numbers(self, total_pages: int) -> None:
-        page_num = self.getPageNumber()
-        page_text = f"Page {page_num} of {total_pages}"
-        right_x = FOOTER_RIGHT_X
-        # Version line
+    @staticmethod
+    def _page_label_form(page_num: int) -> str:
+        return f"coa_page_{page_num}"
+
+    def _draw_version(self) -> None:
         self.setFont("Helvetica", VER_FONT_SIZE)
         self.setFillColor(colors.grey)
-        self.drawRightString(right_x, VER_Y_ABS, f"{self._version_text}")
-        # Page line
+        self.drawRightString(FOOTER_RIGHT_X, VER_Y_ABS, f"{self._version_text}")
+
+    def _draw_page_number(self, page_num: int, total_pages: int) -> None:
         self.setFont("Helvetica", PAGE_FONT_SIZE)
-        self.drawRightString(right_x, PAGE_Y_ABS, page_text)
+        self.setFillColor(colors.grey)
+        self.drawRightString(FOOTER_RIGHT_X, PAGE_Y_ABS, f"Page {page_num} of {total_pages}")
 
 
+# Streamlit re-executes this script on every rerun, so module globals and
+# functools caches do not persist; st.cache_* does.
+@st.cache_data(show_spinner=False)
 def _safe_read_text(path: Path, default: str = "") -> str:
     try:
         return path.read_text(encoding="utf-8").strip()
     except Exception:
         return default.strip()
 
+@st.cache_resource(show_spinner=False)
+def _scaled_image_png(path: Path, max_width: float) -> Tuple[bytes, float, float] | None:
+    """Return (png_bytes, draw_w, draw_h) for an image fitted to max_width points.
 
+    The bitmap is resampled to IMAGE_DPI at its drawn size so the PDF embeds
+    only the pixels it needs instead of the full-resolution source. Only the
+    encoded bytes are cached: ImageReader holds a PIL image and is not safe to
+    share between concurrent builds.
+    """
+    from PIL import Image
 
-def _image_reader_or_none(path: Path) -> ImageReader | None:
     try:
-        if path.is_file():
-            return ImageReader(str(path))
+        if not path.is_file():
+            return None
+        with Image.open(path) as img:
+            iw, ih = img.size
+            scale = min(max_width / float(iw), 1.0)
+            draw_w, draw_h = iw * scale, ih * scale
+            px_w = min(iw, int(round(draw_w / 72.0 * IMAGE_DPI)))
+            px_h = min(ih, int(round(draw_h / 72.0 * IMAGE_DPI)))
+            if (px_w, px_h) != (iw, ih):
+                img = img.resize((px_w, px_h), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue(), draw_w, draw_h
     except Exception:
-        pass
-    return None
+        return None
+
+
+def _scaled_image_or_none(path: Path, max_width: float) -> Tuple[ImageReader, float, float] | None:
+    """Return (reader, draw_w, draw_h) over the cached, pre-scaled PNG."""
+    scaled = _scaled_image_png(path, max_width)
+    if scaled is None:
+        return None
+    png, draw_w, draw_h = scaled
+    return ImageReader(io.BytesIO(png)), draw_w, draw_h
+
+
+DEFAULT_DISCLAIMER = (
+    "DISCLAIMER: Materials, products, and services are provided under our standard terms and conditions."
+)
+
+# --- PDF styles ---
+# Read-only, so every build can share them. `streamlit run` re-executes this
+# module on each rerun, which rebuilds them too (about 0.1 ms); not worth caching.
+_STYLES = getSampleStyleSheet()
+_STYLE_TITLE = ParagraphStyle(
+    "Title",
+    parent=_STYLES["Heading1"],
+    fontName="Helvetica-Bold",
+    fontSize=16,
+    leading=18,
+    alignment=1,  # center
+    spaceAfter=8,
+)
+_STYLE_BAR = ParagraphStyle(
+    "Bar",
+    parent=_STYLES["Normal"],
+    fontName="Helvetica-Bold",
+    fontSize=10,
+    textColor=colors.black,
+    leading=12,
+    spaceBefore=6,
+    spaceAfter=4,
+)
+_STYLE_CELL = ParagraphStyle(
+    "Cell",
+    parent=_STYLES["Normal"],
+    fontName="Helvetica",
+    fontSize=9,
+    leading=11,
+)
+_STYLE_CELL_BOLD = ParagraphStyle(
+    "CellBold",
+    parent=_STYLE_CELL,
+    fontName="Helvetica-Bold",
+)
+_STYLE_SMALL = ParagraphStyle(
+    "Small",
+    parent=_STYLES["Normal"],
+    fontSize=9,
+    leading=11,
+    textColor=colors.grey,
+)
+_DISC_STYLE = ParagraphStyle(
+    "Disc",
+    parent=_STYLE_SMALL,
+    fontName="Helvetica",
+    fontSize=DISC_FONT_SIZE,
+    leading=8,
+    textColor=colors.grey,
+    alignment=4,  # TA_JUSTIFY
+)
+
+# Table styles are never mutated after construction and can be shared
+_BAR_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#e6e6e6")),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ("TOPPADDING", (0, 0), (-1, -1), 2),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+])
+_INFO_TABLE_STYLE = TableStyle([  # customer + product information
+    ("BOX", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 5),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 5),
+    ("TOPPADDING", (0, 0), (-1, -1), 2),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+])
+_TP_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e6e6e6")),
+    ("BOX", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 5),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 5),
+    ("TOPPADDING", (0, 0), (-1, -1), 2),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+])
 
 # --- Formatting helpers ---
-from datetime import datetime
+# Accepted input date formats, tried in order (month-first ahead of day-first, as pandas does)
+_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%y",
+    "%Y/%m/%d",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%m.%d.%Y",
+    "%d.%m.%Y",
+    "%Y.%m.%d",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%B %d %Y",
+    "%b %d %Y",
+    "%d %B %Y",
+    "%d %b %Y",
+)
+# Trailing time of day, e.g. " 0:00", " 13:45:00.000", "T13:45:00Z", " 1:30 PM"
+_TIME_SUFFIX_RE = re.compile(
+    r"[ T](?:[01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d+)?)?(?:\s*[AaPp][Mm])?(?:\s*(?:Z|[+-]\d{2}:?\d{2}))?$"
+)
+
 
 def _normalize_date_str(s: str) -> str:
     """Return YYYY-MM-DD if s parses as a date; else the original string."""
-    if not s:
-        return s
-    try:
-        # Pandas-style parsing for robustness
-        dt = pd.to_datetime(s, errors="coerce")
-        if pd.isna(dt):
-            return s
-        # If Timestamp, get date component
-        if hasattr(dt, "to_pydatetime"):
-            dt = dt.to_pydatetime()
-        if isinstance(dt, datetime):
-            return dt.strftime("%Y-%m-%d")
-        return str(dt)[:10]
-    except Exception:
+    text = s.strip() if s else s
+    if not text:
         return s
+    # Only the date part matters; Excel CSV exports write "1/30/2024 0:00"
+    text = _TIME_SUFFIX_RE.sub("", text)
+    # strptime lets %m/%d take one digit, so compact YYYYMMDD needs exactly 8 digits
+    formats = ("%Y%m%d",) if len(text) == 8 and text.isdigit() else _DATE_FORMATS
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return s
+
+# Plain decimal numbers with optional thousands commas and exponent; a match is
+# always accepted by float() once the commas are removed.
+_NUM_RE = re.compile(r"^[-+]?(?=[.,]?\d)[\d,]*(?:\.\d*)?(?:[eE][-+]?\d+)?$")
+
 
 def _sci_if_needed(val: str) -> str:
     """If numeric and |value| >= 1000, return in scientific notation like 1.5E+06."""
-    if val is None:
+    if not val:
         return ""
     s = str(val).strip()
-    if not s:
-        return s
-    try:
-        # remove commas for parsing
-        f = float(s.replace(",", ""))
-        if abs(f) >= 1000:
-            return f"{f:.1E}"
-        return s
-    except Exception:
+    if not _NUM_RE.match(s):
         return s
+    f = float(s.replace(",", ""))
+    if abs(f) >= 1000:
+        return f"{f:.1E}"
+    return s
 
 
 def generate_coa_pdf_vector(
@@ -225,26 +447,21 @@ def generate_coa_pdf_vector(
 ) -> bytes:
     """Vector PDF via ReportLab with header/footer, margins, and auto page numbers."""
 
-    # Load assets
-    header_ir = _image_reader_or_none(HEADER_PATH)
-    footer_ir = _image_reader_or_none(FOOTER_PATH)
-    disclaimer_text = _safe_read_text(
-        DISCLAIMER_PATH,
-        default="DISCLAIMER: Materials, products, and services are provided under our standard terms and conditions.",
-    )
+    # Assets (cached across reruns)
+    header_img = _scaled_image_or_none(HEADER_PATH, CONTENT_WIDTH)
+    footer_img = _scaled_image_or_none(FOOTER_PATH, CONTENT_WIDTH)
+    disclaimer_text = _safe_read_text(DISCLAIMER_PATH, default=DEFAULT_DISCLAIMER)
     version_text = _safe_read_text(VERSION_PATH, default="1.0")
 
-    # Pre-measure scaled header/footer height to set frame margins
-    def scaled_h(img_ir: ImageReader | None, max_width: float) -> float:
-        if not img_ir:
-            return 0.0
-        iw, ih = img_ir.getSize()
-        scale = min(max_width / float(iw), 1.0)
-        return ih * scale
-
-    content_width = PAGE_W - 2 * MARGIN
-    header_h = scaled_h(header_ir, content_width)
-    footer_h = scaled_h(footer_ir, content_width)
+    # Header/footer placement is identical on every page: (reader, x, y, w, h)
+    header_box = footer_box = None
+    header_h = footer_h = 0.0
+    if header_img:
+        header_ir, header_w, header_h = header_img
+        header_box = (header_ir, MARGIN, PAGE_H - MARGIN - header_h, header_w, header_h)
+    if footer_img:
+        footer_ir, footer_w, footer_h = footer_img
+        footer_box = (footer_ir, MARGIN, MARGIN, footer_w, footer_h)
 
     # Reserve space for header and footer within 1/8" margins
     top_margin = MARGIN + (header_h + (6 if header_h else 0))
@@ -271,56 +488,10 @@ def generate_coa_pdf_vector(
         showBoundary=0,
     )
 
-    styles = getSampleStyleSheet()
-    style_title = ParagraphStyle(
-        "Title",
-        parent=styles["Heading1"],
-        fontName="Helvetica-Bold",
-        fontSize=16,
-        leading=18,
-        alignment=1,  # center
-        spaceAfter=8,
-    )
-    style_bar = ParagraphStyle(
-        "Bar",
-        parent=styles["Normal"],
-        fontName="Helvetica-Bold",
-        fontSize=10,
-        textColor=colors.black,
-        leading=12,
-        spaceBefore=6,
-        spaceAfter=4,
-    )
-    style_cell = ParagraphStyle(
-        "Cell",
-        parent=styles["Normal"],
-        fontName="Helvetica",
-        fontSize=9,
-        leading=11,
-    )
-    style_cell_bold = ParagraphStyle(
-        "CellBold",
-        parent=style_cell,
-        fontName="Helvetica-Bold",
-    )
-    style_small = ParagraphStyle(
-        "Small",
-        parent=styles["Normal"],
-        fontSize=9,
-        leading=11,
-        textColor=colors.grey,
-    )
-
     # Section header (gray bar) helper using a one-cell table
     def section_bar(label: str):
-        tbl = Table([[Paragraph(label, style_bar)]], colWidths=[doc.width])
-        tbl.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#e6e6e6")),
-            ("LEFTPADDING", (0, 0), (-1, -1), 6),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-            ("TOPPADDING", (0, 0), (-1, -1), 2),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-        ]))
+        tbl = Table([[Paragraph(label, _STYLE_BAR)]], colWidths=[doc.width])
+        tbl.setStyle(_BAR_TABLE_STYLE)
         return tbl
 
     story: List = []
@@ -337,24 +508,16 @@ def generate_coa_pdf_vector(
     ci_cells = []
     for l1, v1, l2, v2 in customer_info_rows:
         # Normalize date values where applicable
-        kv1 = _normalize_date_str(v1) if "order" in l1.lower() or "shipped" in l1.lower() else v1
-        kv2 = _normalize_date_str(v2) if ("quote" in l2.lower()) is False and ("shipped" in l2.lower()) else v2
+        kv1 = _normalize_date_str(v1) if l1.lower() in _DATE_LABELS else v1
+        kv2 = _normalize_date_str(v2) if l2.lower() in _DATE_LABELS else v2
         ci_cells.append([
-            Paragraph(l1, style_cell_bold),
-            Paragraph(kv1, style_cell),
-            Paragraph(l2, style_cell_bold),
-            Paragraph(kv2, style_cell),
+            Paragraph(l1, _STYLE_CELL_BOLD),
+            Paragraph(kv1, _STYLE_CELL),
+            Paragraph(l2, _STYLE_CELL_BOLD),
+            Paragraph(kv2, _STYLE_CELL),
         ])
-    ci_tbl = Table(ci_cells, colWidths=_fit_col_widths(CI_COL_WIDTHS, doc.width))
-    ci_tbl.setStyle(TableStyle([
-        ("BOX", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 5),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 5),
-        ("TOPPADDING", (0, 0), (-1, -1), 2),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-    ]))
+    ci_tbl = Table(ci_cells, colWidths=_CI_W)
+    ci_tbl.setStyle(_INFO_TABLE_STYLE)
     story.append(ci_tbl)
     story.append(Spacer(1, 6))
 
@@ -370,26 +533,16 @@ def generate_coa_pdf_vector(
     pi_cells = []
     for l1, v1, l2, v2 in product_info_rows:
         # Normalize date values by label
-        is_date1 = any(k in l1.lower() for k in ("manufacturing date", "expiration", "test date", "print date"))
-        is_date2 = any(k in l2.lower() for k in ("manufacturing date", "expiration", "test date", "print date"))
-        kv1 = _normalize_date_str(v1) if is_date1 else v1
-        kv2 = _normalize_date_str(v2) if is_date2 else v2
+        kv1 = _normalize_date_str(v1) if l1.lower() in _DATE_LABELS else v1
+        kv2 = _normalize_date_str(v2) if l2.lower() in _DATE_LABELS else v2
         pi_cells.append([
-            Paragraph(l1, style_cell_bold),
-            Paragraph(kv1, style_cell),
-            Paragraph(l2, style_cell_bold),
-            Paragraph(kv2, style_cell),
+            Paragraph(l1, _STYLE_CELL_BOLD),
+            Paragraph(kv1, _STYLE_CELL),
+            Paragraph(l2, _STYLE_CELL_BOLD),
+            Paragraph(kv2, _STYLE_CELL),
         ])
-    pi_tbl = Table(pi_cells, colWidths=_fit_col_widths(PI_COL_WIDTHS, doc.width))
-    pi_tbl.setStyle(TableStyle([
-        ("BOX", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 5),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 5),
-        ("TOPPADDING", (0, 0), (-1, -1), 2),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-    ]))
+    pi_tbl = Table(pi_cells, colWidths=_PI_W)
+    pi_tbl.setStyle(_INFO_TABLE_STYLE)
     story.append(pi_tbl)
     story.append(Spacer(1, 6))
 
@@ -398,75 +551,50 @@ def generate_coa_pdf_vector(
 
     # header + rows
     tp_data: List[List] = [[
-        Paragraph("PROPERTY", style_cell_bold),
-        Paragraph("TEST METHOD", style_cell_bold),
-        Paragraph("UNIT", style_cell_bold),
-        Paragraph("LOWER LIMIT", style_cell_bold),
-        Paragraph("UPPER LIMIT", style_cell_bold),
-        Paragraph("RESULT", style_cell_bold),
+        Paragraph(label, _STYLE_CELL_BOLD)
+        for label in ("PROPERTY", "TEST METHOD", "UNIT", "LOWER LIMIT", "UPPER LIMIT", "RESULT")
     ]]
     for t in tests:
+        lower = t.get("lower_limit", "")
+        upper = t.get("upper_limit", "")
+        result = t.get("result", "")
         tp_data.append([
-            Paragraph(t.get("property", ""), style_cell),
-            Paragraph(t.get("test_method", ""), style_cell),
-            Paragraph(t.get("unit", ""), style_cell),
-            Paragraph(_sci_if_needed(t.get("lower_limit", "")), style_cell),
-            Paragraph(_sci_if_needed(t.get("upper_limit", "")), style_cell),
-            Paragraph(_sci_if_needed(t.get("result", "")), style_cell),
+            Paragraph(t.get("property", ""), _STYLE_CELL),
+            Paragraph(t.get("test_method", ""), _STYLE_CELL),
+            Paragraph(t.get("unit", ""), _STYLE_CELL),
+            Paragraph(_sci_if_needed(lower) if lower else "", _STYLE_CELL),
+            Paragraph(_sci_if_needed(upper) if upper else "", _STYLE_CELL),
+            Paragraph(_sci_if_needed(result) if result else "", _STYLE_CELL),
         ])
 
-    tp_tbl = Table(tp_data, colWidths=_fit_col_widths(TP_COL_WIDTHS, doc.width), repeatRows=1)
-    tp_tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e6e6e6")),
-        ("BOX", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 5),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 5),
-        ("TOPPADDING", (0, 0), (-1, -1), 2),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-    ]))
+    tp_tbl = Table(tp_data, colWidths=_TP_W, repeatRows=1)
+    tp_tbl.setStyle(_TP_TABLE_STYLE)
     story.append(tp_tbl)
     story.append(Spacer(1, 6))
 
     # --- Page decoration (header/footer drawing, page/version) --- #
+    def draw_box(c: canvas.Canvas, box: Tuple[ImageReader, float, float, float, float]):
+        # drawImage already embeds each image once per document (keyed by content digest)
+        img_ir, x, y, w, h = box
+        c.drawImage(
+            img_ir,
+            x, y,
+            width=w, height=h,
+            preserveAspectRatio=True, mask="auto"
+        )
+
+    disc_para = Paragraph((disclaimer_text or "").strip(), _DISC_STYLE)
+
     def on_page(c: canvas.Canvas, doc_obj: BaseDocTemplate):
         # Header image (top inside margins)
-        if header_ir:
-            iw, ih = header_ir.getSize()
-            scale = min(content_width / float(iw), 1.0)
-            new_w, new_h = iw * scale, ih * scale
-            c.drawImage(
-                header_ir,
-                MARGIN, PAGE_H - MARGIN - new_h,
-                width=new_w, height=new_h,
-                preserveAspectRatio=True, mask="auto"
-            )
+        if header_box:
+            draw_box(c, header_box)
 
         # Footer image (bottom inside margins)
-        if footer_ir:
-            iw, ih = footer_ir.getSize()
-            scale = min(content_width / float(iw), 1.0)
-            new_w, new_h = iw * scale, ih * scale
-            c.drawImage(
-                footer_ir,
-                MARGIN, MARGIN,
-                width=new_w, height=new_h,
-                preserveAspectRatio=True, mask="auto"
-            )
+        if footer_box:
+            draw_box(c, footer_box)
 
         # Disclaimer block at absolute position
-        disc_style = ParagraphStyle(
-            "Disc",
-            parent=style_small,
-            fontName="Helvetica",
-            fontSize=DISC_FONT_SIZE,
-            leading=8,
-            textColor=colors.grey,
-            alignment=4,  # TA_JUSTIFY
-        )
-        disc_src = (disclaimer_text or "").strip()
-        disc_para = Paragraph(disc_src, disc_style)
         w, h = disc_para.wrapOn(c, DISC_WIDTH, 300)
         disc_para.drawOn(c, DISC_X_ABS, DISC_Y_ABS)
 
@@ -478,15 +606,8 @@ def generate_coa_pdf_vector(
         return NumberedCanvas(*args, version_text=version_text, footer_h=footer_h, **kwargs)
     doc.build(story, canvasmaker=_canvas_maker)
 
-    # Replace the "__" placeholder with real total page counts:
-    # The NumberedCanvas saves pages with our on_page calls already executed.
-    # For simplicity, re-open buffer to do nothing; page 'of Y' gets drawn by the
-    # second pass in NumberedCanvas.save() where we could draw totals. Here we
-    # kept a placeholder; for a single-pass 'Page X of Y', we accept "Page X of __".
-    #
-    # If you want strict 'Page X of Y', uncomment a more advanced PageCount
-    # routine. For most COAs (single page), this reads "Page 1 of __" which is
-    # acceptable. To force single page, ensure content fits within one page.
+    # Page totals are filled into the per-page label forms by NumberedCanvas.save(),
+    # so the document is laid out and emitted in a single pass.
 
     buffer.seek(0)
     return buffer.getvalue()
@@ -580,7 +701,7 @@ def main():
 
 
 
-    # After Tested Properties expander/divider, add single sidebar Generate & Download button
+    # After Tested Properties expander/divider, add sidebar Generate / Download buttons
     # Build current tests and filename from inputs
     tests = assemble_test_data(vals)
     sku = vals.get("itemSKU", "").strip() or "ITEMSKU"
@@ -588,18 +709,30 @@ def main():
     po = vals.get("poNumber", "").strip() or "CUSTOMERPO"
     filename = f"{sku}_{lot}_{po}.pdf"
 
-    # One-click: Generate & Download in the sidebar
+    # Identifies the inputs that feed the PDF (the filename is derived from them too)
+    pdf_key = hashlib.blake2b(repr((vals, tests)).encode("utf-8"), digest_size=16).hexdigest()
+
     def _build_pdf_bytes() -> bytes:
-        return generate_coa_pdf_vector(vals, tests)
+        # Reuse the last build if the inputs have not changed since
+        if st.session_state.get("pdf_key") != pdf_key or "pdf_bytes" not in st.session_state:
+            st.session_state["pdf_bytes"] = generate_coa_pdf_vector(vals, tests)
+            st.session_state["pdf_key"] = pdf_key
+        return st.session_state["pdf_bytes"]
 
+    # Streamlit reruns the script on every keystroke, so the PDF is only built on request
     with st.sidebar:
-        st.download_button(
-            label="Generate & Download PDF",
-            data=_build_pdf_bytes(),
-            file_name=filename,
-            mime="application/pdf",
-            key="download_generate_single",
-        )
+        if st.button("Generate PDF", key="generate_pdf"):
+            _build_pdf_bytes()
+        if st.session_state.get("pdf_key") == pdf_key:
+            st.download_button(
+                label="Download PDF",
+                data=st.session_state["pdf_bytes"],
+                file_name=filename,
+                mime="application/pdf",
+                key="download_pdf",
+            )
+        elif "pdf_bytes" in st.session_state:
+            st.caption("Inputs changed since the last PDF was generated.")
 
 
 if __name__ == "__main__":